@@ -1,5 +1,5 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.app.core.config import settings
+from .llm_routing import build_agent_llm
 
 def get_lesson_designer_llm():
     """
@@ -9,12 +9,12 @@ def get_lesson_designer_llm():
     the specified model and API key from the application settings.
     
     Returns:
-        An instance of ChatGoogleGenerativeAI configured for lesson planning.
+        A runnable LLM (with optional hedging and fallback) configured for lesson planning.
     """
-    llm = ChatGoogleGenerativeAI(
-        model=settings.LLM_MODEL_NAME,
-        google_api_key=settings.GOOGLE_API_KEY,
+    llm = build_agent_llm(
+        agent_name="lesson_designer",
+        model=settings.LESSON_DESIGNER_MODEL_NAME,
         temperature=0.7,
-        convert_system_message_to_human=True 
+        timeout=settings.LESSON_DESIGNER_TIMEOUT,
     )
     return llm
\ No newline at end of file
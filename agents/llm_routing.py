@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict
+
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for guarded calls; a losing hedge or a call past its deadline keeps running
+# here until the client gives up on its own, since a blocking HTTP request cannot be cancelled
+_call_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+
+class LatencyTracker:
+    """
+    Keeps a rolling window of successful call latencies for one agent and
+    reports the configured percentile as the delay before a hedge is fired.
+    """
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_DELAY
+        index = min(len(samples) - 1, int(len(samples) * settings.LLM_HEDGE_PERCENTILE / 100))
+        return samples[index]
+
+
+_latency_trackers: Dict[str, LatencyTracker] = {}
+
+
+def _get_tracker(agent_name: str) -> LatencyTracker:
+    return _latency_trackers.setdefault(agent_name, LatencyTracker())
+
+
+def _with_deadline(llm: Runnable, agent_name: str, deadline: float) -> Runnable:
+    """
+    Wraps an LLM chain (primary plus any fallback) so the whole call, retries included,
+    fails with TimeoutError after `deadline` seconds.
+
+    With LLM_HEDGE_ENABLED, if the first call outlasts the agent's latency percentile,
+    an identical second call is fired and whichever finishes first successfully wins.
+    """
+    tracker = _get_tracker(agent_name)
+
+    def _timed_invoke(prompt_value, config):
+        start = time.monotonic()
+        output = llm.invoke(prompt_value, config)
+        tracker.record(time.monotonic() - start)
+        return output
+
+    def _guarded_invoke(prompt_value, config):
+        start = time.monotonic()
+        hedge_at = tracker.hedge_delay() if settings.LLM_HEDGE_ENABLED else None
+        pending = {_call_executor.submit(_timed_invoke, prompt_value, config)}
+        last_error = None
+        while pending:
+            elapsed = time.monotonic() - start
+            if elapsed >= deadline:
+                break
+            wait_for = deadline - elapsed if hedge_at is None else min(deadline, hedge_at) - elapsed
+            done, pending = wait(pending, timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+            if hedge_at is not None and pending and time.monotonic() - start >= hedge_at:
+                logger.info(f"---HEDGE: '{agent_name}' exceeded p{settings.LLM_HEDGE_PERCENTILE:g}, firing a second request---")
+                pending.add(_call_executor.submit(_timed_invoke, prompt_value, config))
+                hedge_at = None
+        if not pending and last_error is not None:
+            raise last_error
+        raise TimeoutError(f"'{agent_name}' did not respond within {deadline:g}s")
+
+    return RunnableLambda(_guarded_invoke, name=f"{agent_name}_guarded")
+
+
+def _chat_model(model: str, temperature: float, timeout: float) -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=settings.GOOGLE_API_KEY,
+        temperature=temperature,
+        timeout=timeout,
+        max_retries=settings.LLM_MAX_RETRIES,
+        convert_system_message_to_human=True
+    )
+
+
+def build_agent_llm(agent_name: str, model: str, temperature: float, timeout: float) -> Runnable:
+    """
+    Builds the LLM runnable for one agent: its own model and timeout, a fallback to
+    FALLBACK_LLM_MODEL_NAME when the primary errors, optional hedging, and a single
+    LLM_CALL_DEADLINE covering primary and fallback together.
+
+    Args:
+        agent_name: Identifier used for latency tracking and logging.
+        model: The primary model for this agent.
+        temperature: Sampling temperature for both primary and fallback models.
+        timeout: Timeout in seconds for each attempt (the client retries up to LLM_MAX_RETRIES times).
+
+    Returns:
+        A runnable that can be piped between a prompt and an output parser.
+    """
+    llm = _chat_model(model, temperature, timeout)
+
+    fallback_model = settings.FALLBACK_LLM_MODEL_NAME
+    if fallback_model and fallback_model != model:
+        llm = llm.with_fallbacks([_chat_model(fallback_model, temperature, timeout)])
+    # The deadline wraps the fallback too, so a slow primary followed by a slow fallback
+    # can't add up past the budget
+    return _with_deadline(llm, agent_name, settings.LLM_CALL_DEADLINE)
@@ -1,8 +1,11 @@
 import json
+import sqlite3
 import time
-from typing import TypedDict, List, Dict
+from typing import TypedDict, List, Dict, Optional
 
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
@@ -84,8 +87,71 @@ Here is the lesson plan to base the quiz on:
 
 
 # --- 3. The Graph Builder ---
-def build_content_generation_graph():
-    """Builds the simple 2-step graph for creating a lesson and quiz."""
+class PrunableSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that also records when each run started, so finished runs can be
+    deleted outright and abandoned ones pruned once they pass a TTL.
+    """
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS graph_runs (thread_id TEXT PRIMARY KEY, started_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def record_run(self, thread_id: str) -> None:
+        """Registers a new run; call before the first invoke so pruning never races it."""
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO graph_runs (thread_id, started_at) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+
+    def delete_run(self, thread_id: str) -> None:
+        """Deletes every checkpoint of a run that no longer needs to be resumable."""
+        self.delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM graph_runs WHERE thread_id = ?", (thread_id,))
+
+    def prune_runs(self, max_age_hours: float) -> int:
+        """
+        Deletes runs started more than max_age_hours ago, plus any checkpointed
+        thread with no recorded start time. Returns the number of runs deleted.
+        """
+        cutoff = time.time() - max_age_hours * 3600
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT DISTINCT thread_id FROM checkpoints WHERE thread_id NOT IN "
+                "(SELECT thread_id FROM graph_runs WHERE started_at >= ?)",
+                (cutoff,),
+            )
+            stale = [row[0] for row in cur.fetchall()]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM graph_runs WHERE started_at < ?", (cutoff,))
+        return len(stale)
+
+
+def get_sqlite_checkpointer(db_path: str) -> PrunableSqliteSaver:
+    """
+    Returns a checkpointer that persists graph state to a local SQLite file after every node,
+    so a failed run can resume from its last completed step instead of starting over.
+    """
+    # The API serves requests from a thread pool, so the connection is shared across threads
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    return PrunableSqliteSaver(conn)
+
+
+def build_content_generation_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """
+    Builds the simple 2-step graph for creating a lesson and quiz.
+
+    When a checkpointer is given, each invocation must pass a thread_id in
+    config["configurable"], which identifies the run for later resumption.
+    """
     workflow = StateGraph(ContentGenerationState)
 
     # Add the two nodes for this workflow
@@ -97,6 +163,6 @@ def build_content_generation_graph():
     workflow.add_edge("lesson_planner", "quiz_generator")
     workflow.add_edge("quiz_generator", END)
     
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer)
     print("---CONTENT GENERATION GRAPH COMPILED---")
     return app
\ No newline at end of file
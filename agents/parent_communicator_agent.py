@@ -1,5 +1,5 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.app.core.config import settings
+from .llm_routing import build_agent_llm
 
 def get_parent_communicator_llm():
     """
@@ -8,12 +8,12 @@ def get_parent_communicator_llm():
     This agent is tuned for clear, empathetic, and professional communication.
     
     Returns:
-        An instance of ChatGoogleGenerativeAI configured for this task.
+        A runnable LLM (with optional hedging and fallback) configured for this task.
     """
-    llm = ChatGoogleGenerativeAI(
-        model=settings.LLM_MODEL_NAME,
-        google_api_key=settings.GOOGLE_API_KEY,
+    llm = build_agent_llm(
+        agent_name="parent_communicator",
+        model=settings.PARENT_COMMUNICATOR_MODEL_NAME,
         temperature=0.7, # A balance of creative but professional language
-        convert_system_message_to_human=True
+        timeout=settings.PARENT_COMMUNICATOR_TIMEOUT,
     )
     return llm
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.app.core.config import settings
+from .llm_routing import build_agent_llm
 
 def get_quiz_generator_llm():
     """
@@ -9,12 +9,12 @@ def get_quiz_generator_llm():
     different settings if needed, for generating quizzes.
     
     Returns:
-        An instance of ChatGoogleGenerativeAI configured for quiz generation.
+        A runnable LLM (with optional hedging and fallback) configured for quiz generation.
     """
-    llm = ChatGoogleGenerativeAI(
-        model=settings.LLM_MODEL_NAME,
-        google_api_key=settings.GOOGLE_API_KEY,
+    llm = build_agent_llm(
+        agent_name="quiz_generator",
+        model=settings.QUIZ_GENERATOR_MODEL_NAME,
         temperature=0.5, # Slightly lower temperature for more predictable quiz questions
-        convert_system_message_to_human=True
+        timeout=settings.QUIZ_GENERATOR_TIMEOUT,
     )
     return llm
\ No newline at end of file
@@ -0,0 +1,52 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Brotli is optional; when brotli-asgi is installed it serves br and falls back to gzip itself
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+# Archives are already compressed; running them through br/gzip again only burns CPU
+ALREADY_COMPRESSED_MEDIA_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+}
+
+_UNCOMPRESSED_SEND_KEY = "educopilot.uncompressed_send"
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least `minimum_size` bytes with brotli (if brotli-asgi
+    is installed) or gzip, but sends already-compressed media types such as the
+    parent-note ZIP export straight to the client.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = 500):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressor = BrotliMiddleware(self._route_by_media_type, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressor = GZipMiddleware(self._route_by_media_type, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # The compressor hands the same scope down, so the app side can reach the raw send
+        await self.compressor({**scope, _UNCOMPRESSED_SEND_KEY: send}, receive, send)
+
+    async def _route_by_media_type(self, scope: Scope, receive: Receive, compressing_send: Send):
+        target = compressing_send
+
+        async def send(message: Message):
+            nonlocal target
+            if message["type"] == "http.response.start":
+                media_type = Headers(raw=message["headers"]).get("content-type", "").split(";")[0].strip().lower()
+                if media_type in ALREADY_COMPRESSED_MEDIA_TYPES:
+                    target = scope[_UNCOMPRESSED_SEND_KEY]
+            await target(message)
+
+        await self.app(scope, receive, send)
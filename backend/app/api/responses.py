@@ -0,0 +1,15 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from backend.app.core import serialization
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that renders through the fast serializer.
+    Used as the app's default response class so every endpoint benefits; endpoints
+    returning large plain dicts can also return it directly to skip jsonable_encoder.
+    """
+    def render(self, content: Any) -> bytes:
+        return serialization.dumps(content)
@@ -1,15 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from backend.app.services import agent_service
-from backend.app.core import database_handler
-from typing import List, Dict, Any, Optional
+from backend.app.api.responses import FastJSONResponse
+from backend.app.services import agent_service, export_service
+from backend.app.services.pregeneration_scheduler import scheduler
+from backend.app.core import database_handler, content_store, results_archive, support_store
+from backend.app.core.config import settings
+from typing import List, Dict, Any, Optional, Literal
+from datetime import datetime, timedelta
 
 router = APIRouter()
 
+# --- Partitioning ---
+def get_class_id(x_class_id: Optional[str] = Header(None)) -> str:
+    """
+    Resolves the caller's class/school partition from the X-Class-ID header,
+    so each request only reads and writes that tenant's shard.
+    """
+    try:
+        return database_handler.validate_partition(x_class_id or database_handler.DEFAULT_PARTITION)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # --- Pydantic Models ---
 class ContentRequest(BaseModel):
     topic: str
     grade_level: str
+    # Skip pre-generated content for registered topics and run the agents again
+    regenerate: bool = False
+
+class ResumeContentRequest(BaseModel):
+    run_id: str
+
+class ScheduledTopic(BaseModel):
+    topic: str
+    grade_level: str
+    scheduled_for: Optional[str] = Field(None, example="2025-09-15") # ISO date the lesson is taught
+
+class ScheduleTopicsRequest(BaseModel):
+    topics: List[ScheduledTopic]
 
 class SupportRequest(BaseModel):
     topic: str
@@ -17,6 +46,8 @@ class SupportRequest(BaseModel):
     student_name: str
     student_performance_summary: str
     wrong_answers: List[Dict[str, Any]]
+    # When provided, the generated material is cached for reuse by the parent-note workflow
+    student_id: Optional[int] = None
 
 class SaveScoreRequest(BaseModel):
     student_id: int
@@ -25,18 +56,80 @@ class SaveScoreRequest(BaseModel):
     total_questions: int
     wrong_answers: List[Dict[str, Any]]
 
+class CompactResultsRequest(BaseModel):
+    older_than_days: int = Field(default_factory=lambda: settings.ARCHIVE_AFTER_DAYS, ge=0)
+
+class SaveStudentRequest(BaseModel):
+    id: int
+    name: str
+    performance_summary: str
+
+class ParentNoteRequest(BaseModel):
+    student_id: int
+    quiz_topic: str
+
+class ParentNotesExportRequest(BaseModel):
+    quiz_topic: str
+    student_ids: Optional[List[int]] = None # Defaults to every student with a result on the topic
+    format: Literal["csv", "zip"] = "csv"
+
 # --- API Endpoints ---
 @router.post("/generate-content", tags=["Workflows"])
 def generate_content_endpoint(request: ContentRequest):
     result = agent_service.run_content_generation(
-        topic=request.topic, grade_level=request.grade_level
+        topic=request.topic, grade_level=request.grade_level, use_cache=not request.regenerate
     )
     if result["status"] == "error":
-        raise HTTPException(status_code=500, detail=result["message"])
+        # The run_id lets the client retry from the last completed step via /generate-content/resume
+        raise HTTPException(status_code=500, detail={"message": result["message"], "run_id": result["run_id"]})
+    return result["data"]
+
+@router.post("/generate-content/resume", tags=["Workflows"])
+def resume_content_endpoint(request: ResumeContentRequest):
+    """
+    Resumes a failed content generation run (or retries an empty quiz) from its
+    last checkpoint, so the lesson plan is not generated a second time.
+    """
+    result = agent_service.resume_content_generation(request.run_id)
+    if result["status"] == "not_found":
+        raise HTTPException(status_code=404, detail=result["message"])
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail={"message": result["message"], "run_id": result["run_id"]})
     return result["data"]
 
+@router.post("/scheduled-topics", tags=["Workflows"])
+def schedule_topics_endpoint(request: ScheduleTopicsRequest):
+    """
+    Registers upcoming curriculum topics so their lesson plan and quiz are
+    pre-generated off-peak and /generate-content can serve them from cache.
+    """
+    try:
+        registered = content_store.register_scheduled_topics([t.dict() for t in request.topics])
+        return {"status": "success", "data": registered}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scheduled-topics", tags=["Workflows"])
+def get_scheduled_topics_endpoint():
+    """Lists registered upcoming topics with their pre-generation status."""
+    try:
+        return {"data": content_store.get_scheduled_topics()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/scheduled-topics/run", tags=["Workflows"], status_code=202)
+def run_scheduled_topics_endpoint():
+    """
+    Starts pre-generating pending topics in the background, outside the off-peak window
+    but within the rate budget. Poll GET /scheduled-topics for per-topic status.
+    """
+    queued = scheduler.trigger()
+    if queued is None:
+        return {"status": "already_running", "data": {"queued": 0}}
+    return {"status": "accepted", "data": {"queued": queued}}
+
 @router.post("/generate-support", tags=["Workflows"])
-def generate_support_endpoint(request: SupportRequest):
+def generate_support_endpoint(request: SupportRequest, class_id: str = Depends(get_class_id)):
     result = agent_service.run_support_generation(
         topic=request.topic,
         quiz_score=request.quiz_score,
@@ -44,14 +137,56 @@ def generate_support_endpoint(request: SupportRequest):
         student_performance_summary=request.student_performance_summary,
         wrong_answers=request.wrong_answers,
     )
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail=result["message"])
+    if request.student_id is not None:
+        support_store.save_support_material(
+            student_id=request.student_id,
+            quiz_topic=request.topic,
+            score=request.quiz_score,
+            content=result["data"]["differentiated_output"],
+            partition=class_id,
+        )
+    return result["data"]
+
+@router.post("/parent-note", tags=["Workflows"])
+def generate_parent_note_endpoint(request: ParentNoteRequest, class_id: str = Depends(get_class_id)):
+    """
+    Drafts a parent note for a student's latest result on a topic, reusing cached support material.
+    """
+    student = database_handler.get_student(request.student_id, partition=class_id)
+    if student is None:
+        raise HTTPException(status_code=404, detail=f"Student {request.student_id} not found.")
+    latest = database_handler.get_latest_results(request.quiz_topic, student_id=request.student_id, partition=class_id)
+    if not latest:
+        raise HTTPException(status_code=404, detail=f"No results for student {request.student_id} on '{request.quiz_topic}'.")
+
+    result = agent_service.run_parent_note_for_result(student, latest[0], partition=class_id)
     if result["status"] == "error":
         raise HTTPException(status_code=500, detail=result["message"])
     return result["data"]
 
+@router.post("/parent-notes/export", tags=["Workflows"])
+def export_parent_notes_endpoint(request: ParentNotesExportRequest, class_id: str = Depends(get_class_id)):
+    """
+    Generates parent notes for a whole class on a topic and streams them back as a CSV or ZIP download.
+    """
+    notes = agent_service.iter_parent_notes(request.quiz_topic, student_ids=request.student_ids, partition=class_id)
+    filename = f"parent_notes_{export_service.slugify(request.quiz_topic)}"
+    if request.format == "zip":
+        body, media_type, filename = export_service.iter_parent_notes_zip(notes), "application/zip", f"{filename}.zip"
+    else:
+        body, media_type, filename = export_service.iter_parent_notes_csv(notes), "text/csv", f"{filename}.csv"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 # In educopilot/backend/app/api/v1/endpoints/generation.py
 
 @router.post("/save-score", tags=["Database"])
-def save_score_endpoint(request: SaveScoreRequest):
+def save_score_endpoint(request: SaveScoreRequest, class_id: str = Depends(get_class_id)):
     """
     Receives a student's quiz score and saves it to the database.
     """
@@ -63,28 +198,70 @@ def save_score_endpoint(request: SaveScoreRequest):
             score=request.score_percent,
             total_questions=request.total_questions,
             # --- THIS IS THE FIX ---
-            wrong_answers=request.wrong_answers # Pass the wrong_answers from the request
+            wrong_answers=request.wrong_answers, # Pass the wrong_answers from the request
+            partition=class_id
         )
         return {"status": "success", "data": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/quiz-results", tags=["Database"])
-def get_quiz_results_endpoint():
+def get_quiz_results_endpoint(class_id: str = Depends(get_class_id)):
     """Retrieves all quiz results, wrapped in a consistent dictionary."""
     try:
-        results = database_handler.get_quiz_results()
+        results = database_handler.get_quiz_results(partition=class_id)
         # --- THIS IS THE FIX ---
-        return {"data": results}
+        # Stored rows are already plain JSON, so skip FastAPI's jsonable_encoder pass
+        return FastJSONResponse({"data": results})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/quiz-results/compact", tags=["Database"])
+def compact_quiz_results_endpoint(request: CompactResultsRequest, class_id: str = Depends(get_class_id)):
+    """Moves the class's results older than the cutoff into the compressed columnar archive."""
+    try:
+        cutoff = datetime.now() - timedelta(days=request.older_than_days)
+        return {"status": "success", "data": results_archive.compact_results(cutoff, partition=class_id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/quiz-results/analytics", tags=["Database"])
+def quiz_results_analytics_endpoint(
+    group_by: Literal["quiz_topic", "student_id"] = "quiz_topic",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    quiz_topic: Optional[str] = None,
+    class_id: str = Depends(get_class_id)
+):
+    """Aggregates scores across live and archived results for long-term analytics."""
+    try:
+        data = results_archive.aggregate_scores(
+            partition=class_id, group_by=group_by, since=since, until=until, quiz_topic=quiz_topic
+        )
+        return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/students", tags=["Database"])
-def get_students_endpoint():
+def get_students_endpoint(class_id: str = Depends(get_class_id)):
     """Retrieves all students, wrapped in a consistent dictionary."""
     try:
-        students = database_handler.get_all_students()
+        students = database_handler.get_all_students(partition=class_id)
         # --- THIS IS THE FIX ---
         return {"data": students}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/students", tags=["Database"])
+def save_student_endpoint(request: SaveStudentRequest, class_id: str = Depends(get_class_id)):
+    """Adds or updates a student profile in the caller's class."""
+    try:
+        student = database_handler.save_student(
+            student_id=request.id,
+            name=request.name,
+            performance_summary=request.performance_summary,
+            partition=class_id
+        )
+        return {"status": "success", "data": student}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables from a .env file
@@ -11,5 +12,61 @@ class Settings:
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
     LLM_MODEL_NAME: str = os.getenv("LLM_MODEL_NAME")
 
+    # --- Per-agent model routing (each falls back to LLM_MODEL_NAME when unset) ---
+    LESSON_DESIGNER_MODEL_NAME: str = os.getenv("LESSON_DESIGNER_MODEL_NAME") or LLM_MODEL_NAME
+    QUIZ_GENERATOR_MODEL_NAME: str = os.getenv("QUIZ_GENERATOR_MODEL_NAME") or LLM_MODEL_NAME
+    DIFFERENTIATED_SUPPORT_MODEL_NAME: str = os.getenv("DIFFERENTIATED_SUPPORT_MODEL_NAME") or LLM_MODEL_NAME
+    PARENT_COMMUNICATOR_MODEL_NAME: str = os.getenv("PARENT_COMMUNICATOR_MODEL_NAME") or LLM_MODEL_NAME
+
+    # --- Per-agent request timeouts in seconds ---
+    # These apply to each attempt; the client retries up to LLM_MAX_RETRIES times on top.
+    # LLM_CALL_DEADLINE caps one whole agent call: primary attempts, any hedge and the
+    # fallback model together. /generate-content makes two calls plus a 5 s pause, so
+    # 2 x LLM_CALL_DEADLINE + 5 must stay under the frontend's 300 s request timeout.
+    LESSON_DESIGNER_TIMEOUT: float = float(os.getenv("LESSON_DESIGNER_TIMEOUT", "45"))
+    QUIZ_GENERATOR_TIMEOUT: float = float(os.getenv("QUIZ_GENERATOR_TIMEOUT", "30"))
+    DIFFERENTIATED_SUPPORT_TIMEOUT: float = float(os.getenv("DIFFERENTIATED_SUPPORT_TIMEOUT", "45"))
+    PARENT_COMMUNICATOR_TIMEOUT: float = float(os.getenv("PARENT_COMMUNICATOR_TIMEOUT", "30"))
+
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "1"))
+    LLM_CALL_DEADLINE: float = float(os.getenv("LLM_CALL_DEADLINE", "120"))
+
+    # Secondary model used when the primary call errors or times out (disabled when unset)
+    FALLBACK_LLM_MODEL_NAME: str = os.getenv("FALLBACK_LLM_MODEL_NAME")
+
+    # --- Hedged requests: fire a second call when the first is slower than recent latencies ---
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_DEFAULT_DELAY: float = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "15"))
+
+    # Responses larger than this many bytes are gzip/brotli compressed
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+
+    # --- Scheduled pre-generation of upcoming curriculum topics ---
+    PREGEN_ENABLED: bool = os.getenv("PREGEN_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Off-peak window in local hours; a start later than the end wraps past midnight
+    PREGEN_OFFPEAK_START_HOUR: int = int(os.getenv("PREGEN_OFFPEAK_START_HOUR", "22"))
+    PREGEN_OFFPEAK_END_HOUR: int = int(os.getenv("PREGEN_OFFPEAK_END_HOUR", "6"))
+    # Rate budget: at most this many graph runs (two LLM calls each) per rolling hour
+    PREGEN_MAX_RUNS_PER_HOUR: int = int(os.getenv("PREGEN_MAX_RUNS_PER_HOUR", "10"))
+    PREGEN_POLL_SECONDS: float = float(os.getenv("PREGEN_POLL_SECONDS", "300"))
+    PREGEN_MAX_ATTEMPTS: int = int(os.getenv("PREGEN_MAX_ATTEMPTS", "3"))
+
+    # Quiz results older than this are moved to the compressed columnar archive by compaction
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+
+    # SQLite file holding per-node checkpoints of content generation runs
+    GRAPH_CHECKPOINT_DB: str = os.getenv(
+        "GRAPH_CHECKPOINT_DB",
+        str(Path(__file__).parent.parent.parent.parent / "graph_checkpoints.sqlite")
+    )
+
+    # Checkpoints of runs that never completed are pruned after this many hours
+    GRAPH_CHECKPOINT_TTL_HOURS: float = float(os.getenv("GRAPH_CHECKPOINT_TTL_HOURS", "24"))
+
+    # Upper bound on concurrent LLM calls when generating parent notes for a whole class
+    PARENT_NOTE_MAX_CONCURRENCY: int = int(os.getenv("PARENT_NOTE_MAX_CONCURRENCY", "4"))
+
 # Create a single, importable instance of the settings
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from backend.app.core import serialization
+
+# Generated lesson plans and quizzes are shared across classes, so they live in their own
+# file rather than in a class partition. It also holds the registry of upcoming topics.
+CONTENT_STORE_FILE = Path(__file__).parent.parent.parent.parent / "content_cache.json"
+
+_store_lock = threading.Lock()
+
+def _read_store() -> Dict:
+    try:
+        with open(CONTENT_STORE_FILE, 'rb') as f:
+            return serialization.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return {"generated_content": {}, "scheduled_topics": []}
+
+def _write_store(data: Dict):
+    # Temp file + os.replace so lock-free readers never see a truncated store
+    tmp_path = CONTENT_STORE_FILE.with_suffix(".json.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(serialization.dumps(data))
+    os.replace(tmp_path, CONTENT_STORE_FILE)
+
+def content_key(topic: str, grade_level: str) -> str:
+    """Normalizes a topic/grade pair so trivially different spellings share a cache entry."""
+    return f"{' '.join(topic.lower().split())}|{' '.join(grade_level.lower().split())}"
+
+# --- Generated Content Cache ---
+# Only topics in the scheduled registry are cached; everything else is generated fresh on each request.
+def _is_scheduled(data: Dict, key: str) -> bool:
+    return any(content_key(t["topic"], t["grade_level"]) == key for t in data.get("scheduled_topics", []))
+
+def get_generated_content(topic: str, grade_level: str) -> Optional[Dict]:
+    """Returns the cached lesson plan and quiz for a registered upcoming topic and grade, if any."""
+    data = _read_store()
+    key = content_key(topic, grade_level)
+    entry = data.get("generated_content", {}).get(key)
+    if entry is None or not _is_scheduled(data, key):
+        return None
+    return {"lesson_plan": entry["lesson_plan"], "quiz": entry["quiz"]}
+
+def save_generated_content(topic: str, grade_level: str, lesson_plan: str, quiz: List[Dict]) -> Optional[Dict]:
+    """
+    Caches a generated lesson plan and quiz and marks the matching scheduled topic as ready.
+    Returns None without caching anything if the topic is not registered.
+    """
+    key = content_key(topic, grade_level)
+    with _store_lock:
+        data = _read_store()
+        if not _is_scheduled(data, key):
+            return None
+        entry = {
+            "topic": topic,
+            "grade_level": grade_level,
+            "lesson_plan": lesson_plan,
+            "quiz": quiz,
+            "generated_at": datetime.now().isoformat()
+        }
+        data.setdefault("generated_content", {})[key] = entry
+        for scheduled in data.get("scheduled_topics", []):
+            if content_key(scheduled["topic"], scheduled["grade_level"]) == key:
+                scheduled["status"] = "ready"
+                scheduled["generated_at"] = entry["generated_at"]
+                scheduled.pop("run_id", None)
+        _write_store(data)
+        return entry
+
+# --- Upcoming Topic Registry ---
+def get_scheduled_topics() -> List[Dict]:
+    """Returns every registered upcoming topic with its pre-generation status."""
+    return _read_store().get("scheduled_topics", [])
+
+def register_scheduled_topics(topics: List[Dict]) -> List[Dict]:
+    """
+    Registers upcoming topics for pre-generation. Each item needs "topic" and
+    "grade_level" and may carry a "scheduled_for" ISO date; earlier dates run first.
+    Topics already registered are updated in place rather than duplicated; registering
+    a topic that is not ready yet again resets its failed attempts so it is retried.
+    """
+    with _store_lock:
+        data = _read_store()
+        existing = {content_key(t["topic"], t["grade_level"]): t for t in data.get("scheduled_topics", [])}
+        cached = data.get("generated_content", {})
+        registered = []
+        for item in topics:
+            key = content_key(item["topic"], item["grade_level"])
+            entry = existing.get(key)
+            if entry is None:
+                entry = {
+                    "topic": item["topic"],
+                    "grade_level": item["grade_level"],
+                    "status": "ready" if key in cached else "pending",
+                    "attempts": 0,
+                    "registered_at": datetime.now().isoformat(),
+                    "generated_at": cached[key]["generated_at"] if key in cached else None
+                }
+                existing[key] = entry
+            elif entry["status"] != "ready":
+                entry["status"] = "pending"
+                entry["attempts"] = 0
+                entry.pop("last_error", None)
+            entry["scheduled_for"] = item.get("scheduled_for")
+            registered.append(entry)
+        data["scheduled_topics"] = list(existing.values())
+        _write_store(data)
+        return registered
+
+def get_pending_topics(max_attempts: int) -> List[Dict]:
+    """Returns topics still awaiting pre-generation, soonest scheduled first."""
+    pending = [
+        t for t in get_scheduled_topics()
+        if t["status"] != "ready" and t.get("attempts", 0) < max_attempts
+    ]
+    return sorted(pending, key=lambda t: (t.get("scheduled_for") or "9999-12-31", t["registered_at"]))
+
+def record_failed_attempt(topic: str, grade_level: str, message: str, run_id: Optional[str] = None):
+    """
+    Counts a failed pre-generation run so a persistently failing topic eventually stops retrying.
+    The failed run's run_id is kept so the next attempt can resume it from its last checkpoint.
+    """
+    key = content_key(topic, grade_level)
+    with _store_lock:
+        data = _read_store()
+        for scheduled in data.get("scheduled_topics", []):
+            if content_key(scheduled["topic"], scheduled["grade_level"]) == key:
+                scheduled["attempts"] = scheduled.get("attempts", 0) + 1
+                scheduled["status"] = "failed"
+                scheduled["last_error"] = message
+                if run_id:
+                    scheduled["run_id"] = run_id
+                else:
+                    scheduled.pop("run_id", None)
+        _write_store(data)
@@ -1,32 +1,82 @@
-import json
+import os
+import re
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 
+from backend.app.core import serialization
+
 DATABASE_FILE = Path(__file__).parent.parent.parent.parent / "database.json"
 
-def _read_db() -> Dict:
-    """Helper function to read the entire JSON database."""
+# --- Partitioning ---
+# Each class (or school) lives in its own shard so reads and writes only touch that tenant's data.
+# The default partition keeps using the original database.json; every other one gets its own file.
+DEFAULT_PARTITION = "default"
+PARTITIONS_DIR = DATABASE_FILE.parent / "partitions"
+_PARTITION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Bulk workflows save from worker threads, so every read-modify-write goes through the shard's lock
+_partition_locks: Dict[str, threading.Lock] = {}
+_partition_locks_guard = threading.Lock()
+
+def validate_partition(partition: str) -> str:
+    """Returns the partition ID if it is safe to use as a shard name, otherwise raises ValueError."""
+    if not _PARTITION_ID_PATTERN.match(partition or ""):
+        raise ValueError(f"Invalid class/partition ID: '{partition}'")
+    return partition
+
+def _partition_file(partition: str) -> Path:
+    if validate_partition(partition) == DEFAULT_PARTITION:
+        return DATABASE_FILE
+    return PARTITIONS_DIR / f"{partition}.json"
+
+def _lock_for(partition: str) -> threading.Lock:
+    with _partition_locks_guard:
+        return _partition_locks.setdefault(partition, threading.Lock())
+
+def list_partitions() -> List[str]:
+    """Returns the IDs of all partitions that have a shard on disk."""
+    partitions = [DEFAULT_PARTITION] if DATABASE_FILE.exists() else []
+    if PARTITIONS_DIR.exists():
+        partitions.extend(sorted(path.stem for path in PARTITIONS_DIR.glob("*.json")))
+    return partitions
+
+def _read_db(partition: str = DEFAULT_PARTITION) -> Dict:
+    """Helper function to read one partition of the JSON database."""
     try:
-        with open(DATABASE_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        with open(_partition_file(partition), 'rb') as f:
+            return serialization.loads(f.read())
+    except (FileNotFoundError, ValueError):
         # If file is broken or not found, return a safe default structure
         return {"students": [], "quiz_results": []}
 
-def _write_db(data: Dict):
-    """Helper function to write data back to the JSON database."""
-    with open(DATABASE_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def _write_db(data: Dict, partition: str = DEFAULT_PARTITION):
+    """
+    Helper function to write one partition back to disk (compact, via the fast serializer).
+    Writes to a temp file and swaps it in, so lock-free readers never see a truncated
+    shard and a crash mid-write leaves the previous version intact.
+    """
+    path = _partition_file(partition)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(serialization.dumps(data))
+    os.replace(tmp_path, path)
 
-def get_all_students() -> List[Dict]:
-    """Reads and returns the list of all students."""
-    data = _read_db()
+def _next_result_id(db_data: Dict) -> int:
+    # Archived results leave the hot list, so IDs continue from the highest ever issued
+    highest = max((r.get("result_id", 0) for r in db_data.get("quiz_results", [])), default=0)
+    return max(highest, db_data.get("last_archived_result_id", 0)) + 1
+
+def get_all_students(partition: str = DEFAULT_PARTITION) -> List[Dict]:
+    """Reads and returns the list of all students in a partition."""
+    data = _read_db(partition)
     return data.get("students", [])
 
-def get_quiz_results() -> List[Dict]:
-    """Reads and returns all saved quiz results."""
-    data = _read_db()
+def get_quiz_results(partition: str = DEFAULT_PARTITION) -> List[Dict]:
+    """Reads and returns all saved quiz results in a partition."""
+    data = _read_db(partition)
     return data.get("quiz_results", [])
 
 # --- THIS IS THE CORRECTED FUNCTION ---
@@ -35,33 +85,105 @@ def save_quiz_result(
     quiz_topic: str, 
     score: int, 
     total_questions: int, 
-    wrong_answers: List[Dict[str, Any]] # It now correctly accepts this parameter
+    wrong_answers: List[Dict[str, Any]], # It now correctly accepts this parameter
+    partition: str = DEFAULT_PARTITION
 ):
-    """Saves a new quiz result to the database."""
-    db_data = _read_db()
-    
-    student_name = "Unknown"
-    # Safely find the student name
-    for student in db_data.get("students", []):
-        if student.get('id') == student_id:
-            student_name = student.get('name', "Unknown")
-            break
-            
-    new_result = {
-        "result_id": len(db_data.get("quiz_results", [])) + 1,
-        "student_id": student_id,
-        "student_name": student_name,
-        "quiz_topic": quiz_topic,
-        "score_percent": score,
-        "total_questions": total_questions,
-        "wrong_answers": wrong_answers, # The data is now correctly included
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    # Ensure the quiz_results key exists before appending
-    if "quiz_results" not in db_data:
-        db_data["quiz_results"] = []
+    """Saves a new quiz result to the given partition."""
+    with _lock_for(partition):
+        db_data = _read_db(partition)
         
-    db_data["quiz_results"].append(new_result)
-    _write_db(db_data)
-    return new_result
\ No newline at end of file
+        student_name = "Unknown"
+        # Safely find the student name
+        for student in db_data.get("students", []):
+            if student.get('id') == student_id:
+                student_name = student.get('name', "Unknown")
+                break
+                
+        new_result = {
+            "result_id": _next_result_id(db_data),
+            "class_id": partition,
+            "student_id": student_id,
+            "student_name": student_name,
+            "quiz_topic": quiz_topic,
+            "score_percent": score,
+            "total_questions": total_questions,
+            "wrong_answers": wrong_answers, # The data is now correctly included
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # Ensure the quiz_results key exists before appending
+        if "quiz_results" not in db_data:
+            db_data["quiz_results"] = []
+            
+        db_data["quiz_results"].append(new_result)
+        _write_db(db_data, partition)
+        return new_result
+
+def archive_quiz_results(
+    cutoff: datetime,
+    archive_fn: Callable[[List[Dict]], Any],
+    partition: str = DEFAULT_PARTITION
+) -> List[Dict]:
+    """
+    Moves results older than the cutoff out of the hot partition.
+
+    archive_fn receives the old rows and must persist them before it returns;
+    only then are they removed from the partition file. Returns the archived rows.
+    """
+    with _lock_for(partition):
+        db_data = _read_db(partition)
+        cutoff_iso = cutoff.isoformat()
+        old_results, hot_results = [], []
+        for result in db_data.get("quiz_results", []):
+            # Rows without a timestamp can't be placed in a time segment, so they stay hot
+            is_old = bool(result.get("timestamp")) and result["timestamp"] < cutoff_iso
+            (old_results if is_old else hot_results).append(result)
+        if not old_results:
+            return []
+
+        archive_fn(old_results)
+        db_data["last_archived_result_id"] = max(
+            db_data.get("last_archived_result_id", 0),
+            max(r.get("result_id", 0) for r in old_results)
+        )
+        db_data["quiz_results"] = hot_results
+        _write_db(db_data, partition)
+        return old_results
+
+def save_student(student_id: int, name: str, performance_summary: str, partition: str = DEFAULT_PARTITION) -> Dict:
+    """Adds or updates a student profile in the given partition."""
+    with _lock_for(partition):
+        db_data = _read_db(partition)
+        student = {
+            "id": student_id,
+            "class_id": partition,
+            "name": name,
+            "performance_summary": performance_summary
+        }
+        students = [s for s in db_data.get("students", []) if s.get("id") != student_id]
+        students.append(student)
+        db_data["students"] = students
+        _write_db(db_data, partition)
+        return student
+
+def get_student(student_id: int, partition: str = DEFAULT_PARTITION) -> Optional[Dict]:
+    """Returns a single student profile, or None if the ID is unknown in this partition."""
+    for student in get_all_students(partition):
+        if student.get("id") == student_id:
+            return student
+    return None
+
+def get_latest_results(quiz_topic: str, student_id: Optional[int] = None, partition: str = DEFAULT_PARTITION) -> List[Dict]:
+    """
+    Returns the most recent result per student for a topic, optionally for a single student.
+    """
+    latest: Dict[int, Dict] = {}
+    for result in get_quiz_results(partition):
+        if result.get("quiz_topic") != quiz_topic:
+            continue
+        if student_id is not None and result.get("student_id") != student_id:
+            continue
+        current = latest.get(result.get("student_id"))
+        if current is None or result.get("timestamp", "") >= current.get("timestamp", ""):
+            latest[result.get("student_id")] = result
+    return list(latest.values())
@@ -0,0 +1,224 @@
+import argparse
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Iterator, Optional
+
+import numpy as np
+
+from backend.app.core import database_handler, serialization
+from backend.app.core.config import settings
+
+# Old quiz results leave the hot JSON partition and are stored here as one compressed,
+# columnar .npz segment per class partition and calendar month (archive/<class_id>/<YYYY-MM>.npz).
+ARCHIVE_DIR = database_handler.DATABASE_FILE.parent / "archive"
+
+GROUP_BY_FIELDS = ("quiz_topic", "student_id")
+
+
+def _segment_dir(partition: str) -> Path:
+    return ARCHIVE_DIR / database_handler.validate_partition(partition)
+
+
+def _encode_segment(rows: List[Dict]) -> Dict[str, np.ndarray]:
+    """Turns result rows into column arrays, dictionary-encoding the repeated strings."""
+    topics, topic_codes = np.unique(np.array([r.get("quiz_topic", "") for r in rows], dtype=str), return_inverse=True)
+    names, name_codes = np.unique(np.array([r.get("student_name", "Unknown") for r in rows], dtype=str), return_inverse=True)
+    # "" marks rows saved before the class_id partition key existed
+    class_ids, class_id_codes = np.unique(np.array([r.get("class_id", "") for r in rows], dtype=str), return_inverse=True)
+    # None marks rows saved before wrong answers were recorded, so they restore without the key
+    wrong_answers = [r.get("wrong_answers") for r in rows]
+    return {
+        "result_id": np.array([r.get("result_id", 0) for r in rows], dtype=np.int64),
+        "student_id": np.array([r.get("student_id", 0) for r in rows], dtype=np.int64),
+        "score_percent": np.array([r.get("score_percent", 0) for r in rows], dtype=np.int16),
+        "total_questions": np.array([r.get("total_questions", 0) for r in rows], dtype=np.int16),
+        "timestamp": np.array([r["timestamp"] for r in rows], dtype="datetime64[us]"),
+        "topic_code": topic_codes.astype(np.int32),
+        "topics": topics,
+        "student_name_code": name_codes.astype(np.int32),
+        "student_names": names,
+        "class_id_code": class_id_codes.astype(np.int32),
+        "class_ids": class_ids,
+        "wrong_answer_count": np.array([len(w or []) for w in wrong_answers], dtype=np.int16),
+        # Kept only so archived rows can be restored losslessly; never scanned
+        "wrong_answers_json": np.frombuffer(serialization.dumps(wrong_answers), dtype=np.uint8),
+    }
+
+
+def _decode_segment(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Rebuilds result rows from a segment's columns."""
+    wrong_answers = serialization.loads(columns["wrong_answers_json"].tobytes())
+    rows = []
+    for i in range(len(columns["result_id"])):
+        row = {"result_id": int(columns["result_id"][i])}
+        # Segments written before class_id was archived have no such column
+        if "class_ids" in columns and columns["class_ids"][columns["class_id_code"][i]]:
+            row["class_id"] = str(columns["class_ids"][columns["class_id_code"][i]])
+        row.update({
+            "student_id": int(columns["student_id"][i]),
+            "student_name": str(columns["student_names"][columns["student_name_code"][i]]),
+            "quiz_topic": str(columns["topics"][columns["topic_code"][i]]),
+            "score_percent": int(columns["score_percent"][i]),
+            "total_questions": int(columns["total_questions"][i]),
+        })
+        if wrong_answers[i] is not None:
+            row["wrong_answers"] = wrong_answers[i]
+        row["timestamp"] = str(columns["timestamp"][i])
+        rows.append(row)
+    return rows
+
+
+def _load_segment(path: Path) -> Dict[str, np.ndarray]:
+    with np.load(path) as segment:
+        return {name: segment[name] for name in segment.files}
+
+
+def _write_segment(path: Path, rows: List[Dict]):
+    """Writes a segment atomically so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **_encode_segment(rows))
+    os.replace(tmp_path, path)
+
+
+def _append_to_segments(rows: List[Dict], partition: str):
+    by_month = defaultdict(list)
+    for row in rows:
+        by_month[row["timestamp"][:7]].append(row)
+
+    for month, month_rows in by_month.items():
+        path = _segment_dir(partition) / f"{month}.npz"
+        if path.exists():
+            # Dedupe by result_id in case an earlier compaction wrote the segment but crashed before trimming the hot file
+            merged = {r["result_id"]: r for r in _decode_segment(_load_segment(path))}
+            merged.update({r["result_id"]: r for r in month_rows})
+            month_rows = list(merged.values())
+        _write_segment(path, sorted(month_rows, key=lambda r: r["timestamp"]))
+
+
+def compact_results(older_than: datetime, partition: str = database_handler.DEFAULT_PARTITION) -> Dict:
+    """
+    Moves a partition's quiz results older than the cutoff into monthly archive segments.
+    """
+    archived = database_handler.archive_quiz_results(
+        older_than, lambda rows: _append_to_segments(rows, partition), partition=partition
+    )
+    return {
+        "class_id": partition,
+        "archived": len(archived),
+        "segments": sorted({r["timestamp"][:7] for r in archived}),
+    }
+
+
+def _to_naive_local(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def _iter_columns(partition: str, since: Optional[datetime], until: Optional[datetime]) -> Iterator[Dict[str, np.ndarray]]:
+    """Yields column sets for the hot partition and every archived month overlapping the range."""
+    hot_rows = [r for r in database_handler.get_quiz_results(partition) if r.get("timestamp")]
+    if hot_rows:
+        yield _encode_segment(hot_rows)
+
+    segment_dir = _segment_dir(partition)
+    if not segment_dir.exists():
+        return
+    first_month = since.strftime("%Y-%m") if since else None
+    last_month = until.strftime("%Y-%m") if until else None
+    for path in sorted(segment_dir.glob("*.npz")):
+        # Time partitioning lets whole months be skipped without opening them
+        if (first_month and path.stem < first_month) or (last_month and path.stem > last_month):
+            continue
+        yield _load_segment(path)
+
+
+def aggregate_scores(
+    partition: str = database_handler.DEFAULT_PARTITION,
+    group_by: str = "quiz_topic",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    quiz_topic: Optional[str] = None
+) -> List[Dict]:
+    """
+    Aggregates scores across hot and archived results with vectorized scans.
+
+    Args:
+        partition: The class/school partition to scan.
+        group_by: "quiz_topic" or "student_id".
+        since: Only include results at or after this time.
+        until: Only include results before this time.
+        quiz_topic: Only include results for this topic.
+
+    Returns:
+        One dict per group with attempts, average/min/max score and zero-score attempts.
+    """
+    if group_by not in GROUP_BY_FIELDS:
+        raise ValueError(f"group_by must be one of {GROUP_BY_FIELDS}")
+    # Stored timestamps are naive local time, so tz-aware bounds are converted before comparing
+    since = _to_naive_local(since)
+    until = _to_naive_local(until)
+
+    totals = defaultdict(lambda: {"attempts": 0, "score_sum": 0, "min_score": None, "max_score": None, "zero_score_attempts": 0})
+    for columns in _iter_columns(partition, since, until):
+        mask = np.ones(len(columns["result_id"]), dtype=bool)
+        if since is not None:
+            mask &= columns["timestamp"] >= np.datetime64(since, "us")
+        if until is not None:
+            mask &= columns["timestamp"] < np.datetime64(until, "us")
+        if quiz_topic is not None:
+            mask &= np.isin(columns["topic_code"], np.flatnonzero(columns["topics"] == quiz_topic))
+        if not mask.any():
+            continue
+
+        scores = columns["score_percent"][mask].astype(np.int64)
+        if group_by == "quiz_topic":
+            codes, labels = columns["topic_code"][mask], columns["topics"]
+        else:
+            labels, codes = np.unique(columns["student_id"][mask], return_inverse=True)
+
+        size = len(labels)
+        counts = np.bincount(codes, minlength=size)
+        sums = np.bincount(codes, weights=scores, minlength=size)
+        zeros = np.bincount(codes, weights=(scores == 0), minlength=size)
+        mins = np.full(size, np.iinfo(np.int64).max)
+        maxs = np.full(size, np.iinfo(np.int64).min)
+        np.minimum.at(mins, codes, scores)
+        np.maximum.at(maxs, codes, scores)
+
+        for i in np.flatnonzero(counts):
+            label = labels[i].item()
+            group = totals[label]
+            group["attempts"] += int(counts[i])
+            group["score_sum"] += int(sums[i])
+            group["zero_score_attempts"] += int(zeros[i])
+            group["min_score"] = int(mins[i]) if group["min_score"] is None else min(group["min_score"], int(mins[i]))
+            group["max_score"] = int(maxs[i]) if group["max_score"] is None else max(group["max_score"], int(maxs[i]))
+
+    return [
+        {
+            group_by: label,
+            "attempts": group["attempts"],
+            "average_score": round(group["score_sum"] / group["attempts"], 2),
+            "min_score": group["min_score"],
+            "max_score": group["max_score"],
+            "zero_score_attempts": group["zero_score_attempts"],
+        }
+        for label, group in sorted(totals.items(), key=lambda item: str(item[0]))
+    ]
+
+
+if __name__ == "__main__":
+    # Compaction job, e.g. from cron: python -m backend.app.core.results_archive --older-than-days 30
+    parser = argparse.ArgumentParser(description="Archive old quiz results into compressed columnar segments.")
+    parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--class-id", help="Only compact this partition (default: all partitions)")
+    args = parser.parse_args()
+
+    cutoff = datetime.now() - timedelta(days=args.older_than_days)
+    for class_id in ([args.class_id] if args.class_id else database_handler.list_partitions()):
+        print(compact_results(cutoff, class_id))
@@ -0,0 +1,68 @@
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from backend.app.core import database_handler, serialization
+
+# Generated support worksheets are large and only read by the parent-note workflow, so they
+# live in one file per class partition (support_materials/<class_id>.json) rather than in the
+# hot class shard that every dashboard read and score save has to parse and rewrite.
+SUPPORT_STORE_DIR = database_handler.DATABASE_FILE.parent / "support_materials"
+
+_store_locks: Dict[str, threading.Lock] = {}
+_store_locks_guard = threading.Lock()
+
+def _store_file(partition: str) -> Path:
+    return SUPPORT_STORE_DIR / f"{database_handler.validate_partition(partition)}.json"
+
+def _lock_for(partition: str) -> threading.Lock:
+    with _store_locks_guard:
+        return _store_locks.setdefault(partition, threading.Lock())
+
+def _read_store(partition: str) -> List[Dict]:
+    try:
+        with open(_store_file(partition), 'rb') as f:
+            return serialization.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return []
+
+def _write_store(materials: List[Dict], partition: str):
+    # Temp file + os.replace so lock-free readers never see a truncated store
+    path = _store_file(partition)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(serialization.dumps(materials))
+    os.replace(tmp_path, path)
+
+def get_support_material(student_id: int, quiz_topic: str, score: int, partition: str = database_handler.DEFAULT_PARTITION) -> Optional[str]:
+    """Returns previously generated support material for this student, topic and score, if any."""
+    for material in _read_store(partition):
+        if (material.get("student_id") == student_id
+                and material.get("quiz_topic") == quiz_topic
+                and material.get("score_percent") == score):
+            return material.get("content")
+    return None
+
+def save_support_material(student_id: int, quiz_topic: str, score: int, content: str, partition: str = database_handler.DEFAULT_PARTITION) -> Dict:
+    """
+    Stores generated support material so later workflows can reuse it instead of regenerating.
+    Only the latest material per student and topic is kept.
+    """
+    with _lock_for(partition):
+        materials = [
+            m for m in _read_store(partition)
+            if not (m.get("student_id") == student_id and m.get("quiz_topic") == quiz_topic)
+        ]
+        new_material = {
+            "student_id": student_id,
+            "quiz_topic": quiz_topic,
+            "score_percent": score,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        }
+        materials.append(new_material)
+        _write_store(materials, partition)
+        return new_material
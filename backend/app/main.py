@@ -1,18 +1,38 @@
 from fastapi import FastAPI
 from backend.app.api.v1.endpoints import generation # Import our new unified endpoint file
+from backend.app.core.config import settings
+from backend.app.api.responses import FastJSONResponse
+from backend.app.api.compression import CompressionMiddleware
+from backend.app.services import agent_service
+from backend.app.services.pregeneration_scheduler import scheduler
 
 app = FastAPI(
     title="EduCopilot API",
     description="The backend API for the EduCopilot multi-agent system.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
+# Compress large result payloads (quiz results, lesson plans) on the wire; ZIP exports pass through as-is
+app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE)
+
 # Include the new router with all our specialized endpoints
 app.include_router(
     generation.router, 
     prefix="/api/v1/generate" # The base URL for all our actions
 )
 
+@app.on_event("startup")
+def start_pregeneration_scheduler():
+    """Prunes stale graph checkpoints and starts the background pre-generation of registered upcoming topics."""
+    agent_service.prune_content_checkpoints()
+    if settings.PREGEN_ENABLED:
+        scheduler.start()
+
+@app.on_event("shutdown")
+def stop_pregeneration_scheduler():
+    scheduler.stop()
+
 @app.get("/", tags=["Root"])
 def read_root():
     """
@@ -1,47 +1,120 @@
 import logging
-from typing import Optional, List, Dict, Any
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Optional, List, Dict, Any, Iterator
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 # Import our specific graph builder and the necessary agent LLM getters
-from agents.main_agent_graph import build_content_generation_graph
+from agents.main_agent_graph import build_content_generation_graph, get_sqlite_checkpointer
 from agents.differentiated_support_agent import get_differentiated_support_llm
 from agents.parent_communicator_agent import get_parent_communicator_llm
+from backend.app.core import database_handler, content_store, support_store
+from backend.app.core.config import settings
 
 # --- Setup ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Build the content generation graph once when the module is loaded
-content_graph_app = build_content_generation_graph()
+# Build the content generation graph once when the module is loaded, checkpointing every
+# completed node so a failed or empty quiz step can be retried without redoing the lesson plan
+content_graph_checkpointer = get_sqlite_checkpointer(settings.GRAPH_CHECKPOINT_DB)
+content_graph_app = build_content_generation_graph(checkpointer=content_graph_checkpointer)
+
+
+def prune_content_checkpoints() -> int:
+    """Deletes checkpoints of runs older than GRAPH_CHECKPOINT_TTL_HOURS. Returns the number of runs removed."""
+    pruned = content_graph_checkpointer.prune_runs(settings.GRAPH_CHECKPOINT_TTL_HOURS)
+    if pruned:
+        logger.info(f"Pruned checkpoints of {pruned} stale content generation runs.")
+    return pruned
+
+
+def _run_config(run_id: str) -> dict:
+    return {"configurable": {"thread_id": run_id}}
+
+
+def _content_result(run_id: str, final_state: Dict) -> dict:
+    """Caches a complete run and wraps its output, including the run_id needed to resume it."""
+    # Only cache complete runs; an empty quiz means the JSON parse failed.
+    # The store ignores topics that are not registered for pre-generation.
+    if final_state.get("lesson_plan") and final_state.get("quiz"):
+        content_store.save_generated_content(
+            final_state["topic"], final_state["grade_level"], final_state["lesson_plan"], final_state["quiz"]
+        )
+        # Nothing left to resume, so the run's checkpoints can go
+        content_graph_checkpointer.delete_run(run_id)
+
+    # This function correctly nests the output in a 'data' key.
+    return {
+        "status": "success", 
+        "data": {
+            "run_id": run_id,
+            "lesson_plan": final_state.get("lesson_plan"),
+            "quiz": final_state.get("quiz"),
+        }
+    }
 
 
 # --- Workflow 1: Content Generation (using the graph) ---
-def run_content_generation(topic: str, grade_level: str) -> dict:
+def run_content_generation(topic: str, grade_level: str, use_cache: bool = True) -> dict:
     """
     Runs the simple 2-step graph to generate a new lesson plan and quiz.
+
+    Registered upcoming topics are served from the content store once generated,
+    unless use_cache is False; any other topic is always generated fresh. Every run gets a
+    run_id, returned on success and on error, which resume_content_generation accepts.
     """
+    run_id = None
     try:
-        logger.info(f"Running content generation workflow for topic: '{topic}'")
+        if use_cache:
+            cached = content_store.get_generated_content(topic, grade_level)
+            if cached is not None:
+                logger.info(f"Serving cached content for topic: '{topic}' ({grade_level})")
+                return {"status": "success", "data": {"run_id": None, **cached}}
+
+        run_id = uuid.uuid4().hex
+        logger.info(f"Running content generation workflow for topic: '{topic}' (run {run_id})")
         inputs = {"topic": topic, "grade_level": grade_level}
-        
-        final_state = content_graph_app.invoke(inputs)
+
+        content_graph_checkpointer.record_run(run_id)
+        final_state = content_graph_app.invoke(inputs, _run_config(run_id))
         
         logger.info("Content generation workflow completed successfully.")
-        
-        # This function correctly nests the output in a 'data' key.
-        return {
-            "status": "success", 
-            "data": {
-                "lesson_plan": final_state.get("lesson_plan"),
-                "quiz": final_state.get("quiz"),
-            }
-        }
+        return _content_result(run_id, final_state)
 
     except Exception as e:
         logger.error(f"Error in content generation: {e}", exc_info=True)
-        return {"status": "error", "message": str(e)}
+        return {"status": "error", "message": str(e), "run_id": run_id}
+
+
+def resume_content_generation(run_id: str) -> dict:
+    """
+    Continues a checkpointed content generation run from its last completed node.
+
+    A run that raised part-way picks up at the failed node; a run that finished
+    with an empty quiz re-runs only the quiz generator on the saved lesson plan.
+    """
+    try:
+        config = _run_config(run_id)
+        snapshot = content_graph_app.get_state(config)
+        if not snapshot.values:
+            return {"status": "not_found", "message": f"Unknown run_id '{run_id}'.", "run_id": run_id}
+
+        if not snapshot.next:
+            if snapshot.values.get("quiz"):
+                return _content_result(run_id, snapshot.values)
+            # Finished with an empty quiz: rewind to just after the lesson planner so only the quiz step runs again
+            content_graph_app.update_state(config, {"quiz": []}, as_node="lesson_planner")
+
+        logger.info(f"Resuming content generation run {run_id} from its last checkpoint.")
+        final_state = content_graph_app.invoke(None, config)
+        return _content_result(run_id, final_state)
+
+    except Exception as e:
+        logger.error(f"Error resuming content generation run {run_id}: {e}", exc_info=True)
+        return {"status": "error", "message": str(e), "run_id": run_id}
 
 
 # --- Workflow 2: Differentiated Support (single agent call) ---
@@ -67,7 +140,7 @@ def run_support_generation(
         
         # Determine which detailed prompt to use based on the score
         if quiz_score < 70:
-            system_prompt = f"""
+            system_prompt = """
 You are an expert, empathetic tutor creating a personalized remedial worksheet for **{student_name}**.
 
 **Student Context:**
@@ -85,7 +158,7 @@ Create a helpful, one-page worksheet titled "{topic}: Let's Review!". It must ha
 Generate only the structured worksheet content.
 """
         elif quiz_score > 90:
-            system_prompt = f"""
+            system_prompt = """
 You are an expert curriculum designer for advanced students, creating an enrichment project for **{student_name}**.
 
 **Student Context:**
@@ -100,7 +173,7 @@ Create an exciting "Enrichment Project Brief" titled "{topic}: Expert Challenge!
 4.  **Submission Format:** Suggest a creative presentation format (e.g., a short video, a slide deck).
 """
         else: # Reinforcement for scores 70-90
-            system_prompt = f"""
+            system_prompt = """
 You are a motivating teacher creating a "Next Steps" activity for **{student_name}**.
 
 **Student Context:**
@@ -117,7 +190,15 @@ Create a short, engaging activity sheet titled "{topic}: Great Job!". It must ha
         prompt = ChatPromptTemplate.from_template(system_prompt)
         chain = prompt | llm | StrOutputParser()
         
-        differentiated_output = chain.invoke({}) # All context is in the prompt template
+        # Values are passed as template variables rather than interpolated, since student data
+        # and wrong answers can contain literal braces (sets, fractions) that would break the template
+        differentiated_output = chain.invoke({
+            "student_name": student_name,
+            "student_performance_summary": student_performance_summary,
+            "quiz_score": quiz_score,
+            "wrong_answers_text": wrong_answers_text,
+            "topic": topic,
+        })
         
         logger.info("Support generation successful.")
 
@@ -146,7 +227,7 @@ def run_parent_communication_generation(student_name: str, quiz_topic: str, scor
         system_prompt = """
 You are an empathetic and professional school communicator. Your task is to draft a brief, positive, and clear note to a student's parent about their recent quiz performance...
 """
-        user_prompt = f"""
+        user_prompt = """
 Please draft the parent note based on this information:
 - Student's Name: {student_name}
 - Quiz Topic: {quiz_topic}
@@ -161,10 +242,135 @@ Please draft the parent note based on this information:
             ("user", user_prompt)
         ])
         chain = prompt | llm | StrOutputParser()
-        parent_note = chain.invoke({})
+        # Passed as variables: LLM-written support material often contains literal braces
+        parent_note = chain.invoke({
+            "student_name": student_name,
+            "quiz_topic": quiz_topic,
+            "score": score,
+            "support_material": support_material,
+        })
         
         return {"status": "success", "parent_note": parent_note}
 
     except Exception as e:
         logger.error(f"An error occurred in parent communication generation: {e}", exc_info=True)
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+
+# --- Workflow 4: Parent Notes from stored results (reuses cached support material) ---
+def get_or_generate_support_material(student: Dict, result: Dict, partition: str = database_handler.DEFAULT_PARTITION) -> dict:
+    """
+    Returns the cached support material for a student's result, generating and caching it only if missing.
+    """
+    cached = support_store.get_support_material(
+        student_id=student["id"], quiz_topic=result["quiz_topic"], score=result["score_percent"], partition=partition
+    )
+    if cached is not None:
+        logger.info(f"Reusing cached support material for {student['name']} on '{result['quiz_topic']}'.")
+        return {"status": "success", "data": {"differentiated_output": cached}}
+
+    support = run_support_generation(
+        topic=result["quiz_topic"],
+        quiz_score=result["score_percent"],
+        student_name=student["name"],
+        student_performance_summary=student.get("performance_summary", "N/A"),
+        wrong_answers=result.get("wrong_answers", []),
+    )
+    if support["status"] == "success":
+        support_store.save_support_material(
+            student_id=student["id"],
+            quiz_topic=result["quiz_topic"],
+            score=result["score_percent"],
+            content=support["data"]["differentiated_output"],
+            partition=partition,
+        )
+    return support
+
+
+def run_parent_note_for_result(student: Dict, result: Dict, partition: str = database_handler.DEFAULT_PARTITION) -> dict:
+    """
+    Drafts a parent note for one stored quiz result, reusing support material where possible.
+    """
+    support = get_or_generate_support_material(student, result, partition)
+    if support["status"] == "error":
+        return support
+
+    note = run_parent_communication_generation(
+        student_name=student["name"],
+        quiz_topic=result["quiz_topic"],
+        score=result["score_percent"],
+        support_material=support["data"]["differentiated_output"],
+    )
+    if note["status"] == "error":
+        return note
+
+    return {
+        "status": "success",
+        "data": {
+            "student_id": student["id"],
+            "student_name": student["name"],
+            "quiz_topic": result["quiz_topic"],
+            "score_percent": result["score_percent"],
+            "parent_note": note["parent_note"],
+        }
+    }
+
+
+def iter_parent_notes(
+    quiz_topic: str,
+    student_ids: Optional[List[int]] = None,
+    partition: str = database_handler.DEFAULT_PARTITION
+) -> Iterator[dict]:
+    """
+    Generates parent notes for the latest result of every matching student in a class on a topic.
+
+    Work runs on a bounded thread pool with at most PARENT_NOTE_MAX_CONCURRENCY notes in
+    flight, and each note is yielded and released as soon as it finishes, so callers can
+    stream notes out without holding the whole batch. Closing the generator early (e.g. an
+    abandoned download) cancels every note that has not started yet.
+    """
+    students = {s["id"]: s for s in database_handler.get_all_students(partition)}
+    results = [
+        r for r in database_handler.get_latest_results(quiz_topic, partition=partition)
+        if r.get("student_id") in students and (student_ids is None or r["student_id"] in student_ids)
+    ]
+    logger.info(f"Generating {len(results)} parent notes for topic '{quiz_topic}'.")
+
+    max_workers = max(1, settings.PARENT_NOTE_MAX_CONCURRENCY)
+    remaining = iter(results)
+    in_flight: Dict[Future, Dict] = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _submit_next():
+        result = next(remaining, None)
+        if result is not None:
+            in_flight[executor.submit(run_parent_note_for_result, students[result["student_id"]], result, partition)] = result
+
+    try:
+        for _ in range(max_workers):
+            _submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = in_flight.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # One bad row (I/O error, malformed result) must not truncate the whole download
+                    logger.error(f"Parent note failed for student {result.get('student_id')}: {e}", exc_info=True)
+                    outcome = {"status": "error", "message": str(e)}
+                # Keep the pool busy while the caller consumes this note
+                _submit_next()
+                if outcome["status"] == "error":
+                    yield {
+                        "student_id": result["student_id"],
+                        "student_name": result.get("student_name", "Unknown"),
+                        "quiz_topic": quiz_topic,
+                        "score_percent": result.get("score_percent"),
+                        "parent_note": "",
+                        "error": outcome["message"],
+                    }
+                else:
+                    yield {**outcome["data"], "error": ""}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,66 @@
+import csv
+import io
+import re
+import zipfile
+from typing import Dict, Iterable, Iterator
+
+PARENT_NOTE_CSV_FIELDS = ["student_id", "student_name", "quiz_topic", "score_percent", "parent_note", "error"]
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """
+    A write-only, non-seekable sink that hands back whatever was written since the last drain.
+    zipfile detects the missing seek() and writes streaming-friendly data descriptors instead.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_") or "note"
+
+
+def iter_parent_notes_csv(notes: Iterable[Dict]) -> Iterator[bytes]:
+    """Streams parent notes as CSV, one encoded row per yielded chunk."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=PARENT_NOTE_CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for note in notes:
+        writer.writerow(note)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_parent_notes_zip(notes: Iterable[Dict]) -> Iterator[bytes]:
+    """Streams parent notes as a ZIP of markdown files, flushing each entry as it is written."""
+    sink = _ChunkBuffer()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for note in notes:
+            name = f"{note['student_id']}_{slugify(note['student_name'])}_{slugify(note['quiz_topic'])}.md"
+            if note.get("error"):
+                body = f"# Parent note for {note['student_name']}\n\n_Generation failed: {note['error']}_\n"
+            else:
+                body = (
+                    f"# Parent note for {note['student_name']}\n\n"
+                    f"**Topic:** {note['quiz_topic']}  \n**Score:** {note['score_percent']}%\n\n"
+                    f"{note['parent_note']}\n"
+                )
+            archive.writestr(name, body)
+            yield sink.drain()
+    # Closing the archive writes the central directory
+    yield sink.drain()
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from backend.app.core import content_store
+from backend.app.core.config import settings
+from backend.app.services import agent_service
+
+logger = logging.getLogger(__name__)
+
+
+def is_off_peak(now: Optional[datetime] = None) -> bool:
+    """True when the current local hour falls inside the configured off-peak window."""
+    hour = (now or datetime.now()).hour
+    start, end = settings.PREGEN_OFFPEAK_START_HOUR, settings.PREGEN_OFFPEAK_END_HOUR
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class PregenerationScheduler:
+    """
+    Background thread that pre-runs the content generation graph for registered
+    upcoming topics during off-peak hours, staying within an hourly run budget.
+    Results land in the content store, so the live /generate-content call becomes a cache read.
+    """
+    def __init__(self):
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_times = deque()
+        # Held for a whole batch so the loop and a manual trigger never pre-generate the same topic twice
+        self._run_lock = threading.Lock()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="pregeneration-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Pre-generation scheduler started.")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        logger.info("Pre-generation scheduler stopped.")
+
+    def _budget_remaining(self) -> int:
+        cutoff = time.monotonic() - 3600
+        while self._run_times and self._run_times[0] < cutoff:
+            self._run_times.popleft()
+        return settings.PREGEN_MAX_RUNS_PER_HOUR - len(self._run_times)
+
+    def run_pending(self) -> int:
+        """
+        Pre-generates as many pending topics as the rate budget allows right now.
+        Returns the number of graph runs started (0 if another batch is already running).
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return 0
+        try:
+            return self._run_batch()
+        finally:
+            self._run_lock.release()
+
+    def trigger(self) -> Optional[int]:
+        """
+        Starts a pre-generation batch on a background thread and returns right away.
+        Returns how many topics the batch will run within the current budget,
+        or None if another batch is already running.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return None
+        queued = min(
+            len(content_store.get_pending_topics(settings.PREGEN_MAX_ATTEMPTS)),
+            max(self._budget_remaining(), 0)
+        )
+
+        def _run_and_release():
+            try:
+                self._run_batch()
+            except Exception as e:
+                logger.error(f"Error in triggered pre-generation batch: {e}", exc_info=True)
+            finally:
+                self._run_lock.release()
+
+        threading.Thread(target=_run_and_release, name="pregeneration-trigger", daemon=True).start()
+        return queued
+
+    def _run_batch(self) -> int:
+        runs = 0
+        for scheduled in content_store.get_pending_topics(settings.PREGEN_MAX_ATTEMPTS):
+            if self._stop_event.is_set() or self._budget_remaining() <= 0:
+                break
+            self._run_times.append(time.monotonic())
+            runs += 1
+            result = self._generate(scheduled)
+            if result["status"] == "error":
+                content_store.record_failed_attempt(
+                    scheduled["topic"], scheduled["grade_level"], result["message"], result.get("run_id")
+                )
+            elif not result["data"].get("quiz"):
+                content_store.record_failed_attempt(
+                    scheduled["topic"], scheduled["grade_level"], "Empty quiz generated.", result["data"].get("run_id")
+                )
+        return runs
+
+    def _generate(self, scheduled: dict) -> dict:
+        """Resumes the topic's last failed run if its checkpoints still exist, otherwise starts a fresh one."""
+        run_id = scheduled.get("run_id")
+        if run_id:
+            logger.info(f"Resuming pre-generation of '{scheduled['topic']}' ({scheduled['grade_level']}) from run {run_id}.")
+            result = agent_service.resume_content_generation(run_id)
+            if result["status"] != "not_found":
+                return result
+        logger.info(f"Pre-generating '{scheduled['topic']}' ({scheduled['grade_level']}).")
+        return agent_service.run_content_generation(scheduled["topic"], scheduled["grade_level"], use_cache=False)
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            if is_off_peak():
+                try:
+                    agent_service.prune_content_checkpoints()
+                    self.run_pending()
+                except Exception as e:
+                    logger.error(f"Error in pre-generation scheduler: {e}", exc_info=True)
+            self._stop_event.wait(settings.PREGEN_POLL_SECONDS)
+
+
+# Single scheduler instance, started and stopped with the app
+scheduler = PregenerationScheduler()
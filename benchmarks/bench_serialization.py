@@ -0,0 +1,99 @@
+"""
+Benchmark for the /quiz-results response path and database writes.
+
+Builds realistic result sets (students, quiz results with wrong answers, cached
+support material) and reports encode time plus bytes on the wire for:
+stdlib json (pretty, as _write_db used to), stdlib json (compact), and the fast
+serializer, each raw and gzip/brotli compressed.
+
+Run from the repository root:
+    python -m benchmarks.bench_serialization
+"""
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.app.core import serialization
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TOPICS = ["The Water Cycle", "Photosynthesis", "The Solar System", "Fractions", "Ancient Egypt", "Electric Circuits"]
+
+
+def build_dataset(num_students: int, results_per_student: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    students = [
+        {
+            "id": 100 + i,
+            "name": f"Student {i}",
+            "performance_summary": "Solid, average performer. Understands material after one or two repetitions. " * 2,
+        }
+        for i in range(num_students)
+    ]
+    start = datetime(2025, 7, 1)
+    results = []
+    for student in students:
+        for _ in range(results_per_student):
+            wrong = [
+                {
+                    "question": f"Which statement best describes stage {q} of the process?",
+                    "their_answer": "Water turns into ice in the clouds.",
+                    "correct_answer": "Water vapour cools and condenses into droplets.",
+                }
+                for q in range(rng.randint(0, 4))
+            ]
+            results.append({
+                "result_id": len(results) + 1,
+                "student_id": student["id"],
+                "student_name": student["name"],
+                "quiz_topic": rng.choice(TOPICS),
+                "score_percent": rng.choice([0, 20, 40, 60, 80, 100]),
+                "total_questions": 5,
+                "wrong_answers": wrong,
+                "timestamp": (start + timedelta(minutes=rng.randint(0, 200_000))).isoformat(),
+            })
+    return {"data": results, "students": students}
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes=((30, 10), (300, 20), (1000, 50)), repeat: int = 5):
+    encoders = {
+        "json indent=2": lambda obj: json.dumps(obj, indent=2).encode("utf-8"),
+        "json compact": lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8"),
+        "fast serializer": serialization.dumps,
+    }
+    print(f"fast serializer backend: {'orjson' if serialization.orjson is not None else 'stdlib json'}")
+    header = f"{'rows':>7} {'encoder':<16} {'encode ms':>10} {'raw KB':>9} {'gzip KB':>9} {'gzip ms':>8}"
+    if brotli is not None:
+        header += f" {'br KB':>8} {'br ms':>8}"
+    print(header)
+    for num_students, per_student in sizes:
+        payload = build_dataset(num_students, per_student)
+        rows = len(payload["data"])
+        for name, encode in encoders.items():
+            encode_s = _time(lambda: encode(payload), repeat)
+            raw = encode(payload)
+            gz_s = _time(lambda: gzip.compress(raw, compresslevel=6), repeat)
+            line = (f"{rows:>7} {name:<16} {encode_s * 1000:>10.2f} {len(raw) / 1024:>9.1f} "
+                    f"{len(gzip.compress(raw, compresslevel=6)) / 1024:>9.1f} {gz_s * 1000:>8.2f}")
+            if brotli is not None:
+                br_s = _time(lambda: brotli.compress(raw, quality=4), repeat)
+                line += f" {len(brotli.compress(raw, quality=4)) / 1024:>8.1f} {br_s * 1000:>8.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    run()
@@ -6,6 +6,9 @@ import pandas as pd
 # --- Configuration ---
 BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
 API_PREFIX = "/api/v1/generate"
+# Scopes every request to this class's storage partition on the backend
+CLASS_ID = os.getenv("CLASS_ID")
+HEADERS = {"X-Class-ID": CLASS_ID} if CLASS_ID else {}
 ENDPOINTS = {
     "Generate Content": f"{BACKEND_URL}{API_PREFIX}/generate-content",
     "Generate Support": f"{BACKEND_URL}{API_PREFIX}/generate-support",
@@ -47,13 +50,14 @@ if st.session_state.view == "main":
             grade_level = st.text_input("Grade Level", value="5th Grade")
         with col2:
             topic = st.text_input("Lesson Topic", value=st.session_state.topic)
+        regenerate = st.checkbox("Generate fresh content (ignore pre-generated version)")
         submitted = st.form_submit_button("Generate Lesson Plan & Quiz")
 
     if submitted:
         st.session_state.topic = topic
         st.session_state.quiz_active = False
         st.session_state.last_score = None # Reset score on new generation
-        payload = {"topic": topic, "grade_level": grade_level}
+        payload = {"topic": topic, "grade_level": grade_level, "regenerate": regenerate}
         with st.spinner("Agents are generating content..."):
             try:
                 response = requests.post(ENDPOINTS["Generate Content"], json=payload, timeout=300)
@@ -83,7 +87,7 @@ if st.session_state.view == "main":
 
             if not st.session_state.quiz_active:
                 try:
-                    students_response = requests.get(ENDPOINTS["Get Students"])
+                    students_response = requests.get(ENDPOINTS["Get Students"], headers=HEADERS)
                     students_response.raise_for_status()
                     all_students = students_response.json().get("data", [])
                     
@@ -133,7 +137,7 @@ if st.session_state.view == "main":
                             
                             score_payload = {"student_id": st.session_state.student_id, "quiz_topic": st.session_state.topic, "score_percent": score_percent, "total_questions": len(quiz_questions), "wrong_answers": wrong_answers_list}
                             try:
-                                requests.post(ENDPOINTS["Save Score"], json=score_payload)
+                                requests.post(ENDPOINTS["Save Score"], json=score_payload, headers=HEADERS)
                             except requests.exceptions.RequestException as e:
                                 st.error(f"Failed to save score: {e}")
 
@@ -147,7 +151,7 @@ elif st.session_state.view == "dashboard":
     st.write("View the most recent student quiz results and generate targeted support.")
     
     try:
-        results_response = requests.get(ENDPOINTS["Get Results"])
+        results_response = requests.get(ENDPOINTS["Get Results"], headers=HEADERS)
         results_response.raise_for_status()
         all_results_data = results_response.json().get("data", [])
 
@@ -177,7 +181,7 @@ elif st.session_state.view == "dashboard":
                 if st.button("Generate Support Materials for Selected Result"):
                     selected_result = result_options[selected_result_key]
                     
-                    students_response = requests.get(ENDPOINTS["Get Students"])
+                    students_response = requests.get(ENDPOINTS["Get Students"], headers=HEADERS)
                     all_students = students_response.json().get("data", [])
                     student_profile = next((s for s in all_students if s['id'] == selected_result['student_id']), None)
 
@@ -186,11 +190,12 @@ elif st.session_state.view == "dashboard":
                         "quiz_score": selected_result['score_percent'],
                         "student_name": selected_result['student_name'],
                         "student_performance_summary": student_profile['performance_summary'] if student_profile else "N/A",
-                        "wrong_answers": selected_result.get('wrong_answers', [])
+                        "wrong_answers": selected_result.get('wrong_answers', []),
+                        "student_id": selected_result['student_id']
                     }
                     with st.spinner("Differentiated Support Agent is at work..."):
                         try:
-                            response = requests.post(ENDPOINTS["Generate Support"], json=payload, timeout=300)
+                            response = requests.post(ENDPOINTS["Generate Support"], json=payload, headers=HEADERS, timeout=300)
                             response.raise_for_status()
                             result = response.json()
                             